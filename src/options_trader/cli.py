@@ -118,6 +118,12 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--risk-free-rate", type=float, default=None)
     parser.add_argument("--put-strike-pct", type=float, default=None)
     parser.add_argument("--call-strike-pct", type=float, default=None)
+    parser.add_argument(
+        "--strike-tolerance",
+        type=float,
+        default=None,
+        help="Skip expiries whose nearest call strike is further than this fraction from the target (default 0.10)",
+    )
     parser.add_argument(
         "--put-variation",
         type=float,
@@ -161,6 +167,9 @@ def _params_from_args(args: argparse.Namespace, base: StrategyParameters) -> Str
     return StrategyParameters(
         put_strike_pct=args.put_strike_pct or base.put_strike_pct,
         call_strike_pct=args.call_strike_pct or base.call_strike_pct,
+        strike_tolerance_pct=(
+            args.strike_tolerance if args.strike_tolerance is not None else base.strike_tolerance_pct
+        ),
         min_days=args.min_days or base.min_days,
         max_days=args.max_days or base.max_days,
         expiry_step=args.expiry_step or base.expiry_step,
@@ -320,6 +329,7 @@ def main(argv: Sequence[str] | None = None) -> int:
         params = StrategyParameters(
             put_strike_pct=config.put_strike_pct,
             call_strike_pct=config.call_strike_pct,
+            strike_tolerance_pct=config.strike_tolerance_pct,
             min_days=config.min_days,
             max_days=config.max_days,
             call_contracts=config.call_to_put_ratio[0],
@@ -366,6 +376,7 @@ def main(argv: Sequence[str] | None = None) -> int:
                 return 0
 
             try:
+                engine.clear_cache()
                 run_time = datetime.now(tz)
                 results = _run_once(engine, tickers, params, args.mode, args.top)
                 report_path = _export_report(results, tickers, args.mode, args.output_dir, run_time)
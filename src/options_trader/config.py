@@ -108,6 +108,7 @@ __all__ = ["AppConfig", "load_config"]
     min_volatility: float = 0.1
     max_volatility: float = 1.0
     put_strike_variation: Sequence[float] = (-0.05, 0.0, 0.05)
+    strike_tolerance_pct: float | None = 0.10
 
     def normalized_tickers(self) -> List[str]:
         return sorted({t.upper().strip() for t in self.tickers if t})
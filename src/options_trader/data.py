@@ -24,9 +24,15 @@ except Exception:  # pragma: no cover - fallback when yfinance is unavailable
 from __future__ import annotations
 
 import math
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, Iterable, List, Optional, Sequence, Union
+from functools import cached_property
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# ``slots=True`` drops the per-instance ``__dict__``; it is only understood by
+# dataclasses on Python 3.10+.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 def _clean_number(value: Optional[Union[float, int]]) -> Optional[float]:
@@ -62,7 +68,7 @@ class MarketData:
         return float(self.historical_prices[-1])
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class OptionQuote:
     """Represents a single option quote."""
 
@@ -142,6 +148,36 @@ class OptionChainSlice:
     calls: Sequence[OptionQuote]
     puts: Sequence[OptionQuote]
 
+    @cached_property
+    def priced_calls(self) -> List[OptionQuote]:
+        """Calls with a usable premium, ordered by strike."""
+
+        return _priced_by_strike(self.calls)
+
+    @cached_property
+    def priced_puts(self) -> List[OptionQuote]:
+        """Puts with a usable premium, ordered by strike."""
+
+        return _priced_by_strike(self.puts)
+
+    @cached_property
+    def priced_call_strikes(self) -> Tuple[float, ...]:
+        """Strikes of :attr:`priced_calls`, index-aligned with the quotes."""
+
+        return tuple(quote.strike for quote in self.priced_calls)
+
+    @cached_property
+    def priced_put_strikes(self) -> Tuple[float, ...]:
+        """Strikes of :attr:`priced_puts`, index-aligned with the quotes."""
+
+        return tuple(quote.strike for quote in self.priced_puts)
+
+
+def _priced_by_strike(quotes: Iterable[OptionQuote]) -> List[OptionQuote]:
+    priced = [quote for quote in quotes if quote.price_per_share > 0]
+    priced.sort(key=lambda q: q.strike)
+    return priced
+
 
 class MarketDataClient(Protocol):
     """Protocol describing market data access."""
@@ -241,12 +277,23 @@ __all__ = [
     "YahooFinanceClient",
 ]
 
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class MarketDataClient:
     """Wrapper around yfinance spot and historical downloads."""
 
-    def __init__(self, period: str = "6mo", interval: str = "1d") -> None:
+    def __init__(
+        self,
+        period: str = "6mo",
+        interval: str = "1d",
+        clock: Callable[[], datetime] | None = None,
+    ) -> None:
         self.period = period
         self.interval = interval
+        # The valuation time is read once per fetch; backtests can pin it.
+        self.clock = clock or _utc_now
 
     def _load_ticker(self, ticker: str):
         try:
@@ -269,7 +316,7 @@ class MarketDataClient:
             raise ValueError(f"Close prices missing for {ticker}.")
         prices = [float(price) for price in close.tolist()]
         spot_price = prices[-1]
-        valuation_date = datetime.now(timezone.utc)
+        valuation_date = self.clock()
         return MarketData(
             ticker=ticker,
             spot_price=spot_price,
@@ -2,10 +2,14 @@
 from __future__ import annotations
 
 import math
-import statistics
 from dataclasses import dataclass
 from typing import Sequence
 
+try:  # pragma: no cover - optional dependency at runtime
+    import numpy as np
+except Exception:  # pragma: no cover - fallback when numpy is unavailable
+    np = None  # type: ignore[assignment]
+
 TRADING_DAYS_PER_YEAR = 252
 
 
@@ -24,15 +28,44 @@ def historical_volatility(
     if len(prices) < 2:
         raise ValueError("Need at least two price points to estimate volatility.")
 
-    log_returns = []
-    for previous, current in zip(prices, prices[1:]):
-        if previous <= 0 or current <= 0:
-            raise ValueError("Prices must be positive to compute log returns.")
-        log_returns.append(math.log(current / previous))
-
-    if len(log_returns) < 2:
-        daily_std = 0.0
+    if np is not None:
+        daily_std = _daily_std_numpy(prices)
     else:
-        daily_std = float(statistics.stdev(log_returns))
+        daily_std = _daily_std_python(prices)
     annualized = daily_std * math.sqrt(trading_days)
     return VolatilityEstimate(annualized=annualized, daily_std=daily_std)
+
+
+def _daily_std_numpy(prices: Sequence[float]) -> float:
+    values = np.asarray(prices, dtype=np.float64)
+    if (values <= 0).any():
+        raise ValueError("Prices must be positive to compute log returns.")
+    log_returns = np.diff(np.log(values))
+    if log_returns.size < 2:
+        return 0.0
+    return float(log_returns.std(ddof=1))
+
+
+def _daily_std_python(prices: Sequence[float]) -> float:
+    # Single Welford pass over the log returns; no intermediate list and none
+    # of the exact-fraction overhead of ``statistics.stdev``.
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    previous = prices[0]
+    if previous <= 0:
+        raise ValueError("Prices must be positive to compute log returns.")
+    for index in range(1, len(prices)):
+        current = prices[index]
+        if current <= 0:
+            raise ValueError("Prices must be positive to compute log returns.")
+        value = math.log(current / previous)
+        count += 1
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+        previous = current
+
+    if count < 2:
+        return 0.0
+    return math.sqrt(m2 / (count - 1))
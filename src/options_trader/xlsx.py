@@ -5,7 +5,6 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, List, Sequence
-from xml.sax.saxutils import escape
 import zipfile
 
 
@@ -25,12 +24,14 @@ class Workbook:
         safe_name = name[:31] if len(name) > 31 else name
         self._worksheets.append(Worksheet(safe_name, rows))
 
-    def save(self, path: Path | str) -> Path:
+    def save(self, path: Path | str, compresslevel: int = 1) -> Path:
         if not self._worksheets:
             raise ValueError("Workbook must contain at least one worksheet")
         output = Path(path)
         output.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zipfile.ZipFile(
+            output, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+        ) as zf:
             zf.writestr("[Content_Types].xml", _content_types(len(self._worksheets)))
             zf.writestr("_rels/.rels", _root_rels())
             zf.writestr("xl/workbook.xml", _workbook_xml(self._worksheets))
@@ -46,11 +47,13 @@ class Workbook:
 """Lightweight XLSX writer for formatted reports."""
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple, Union
-from typing import List, Sequence
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from typing import Iterator, List, Sequence
 from zipfile import ZIP_DEFLATED, ZipFile
 
 
@@ -65,7 +68,13 @@ class Cell:
 class Sheet:
     def __init__(self, title: str) -> None:
         self.title = title
-        self.rows: List[List[Cell]] = []
+        # Rows are stored column-wise: the raw values plus pre-resolved style
+        # ids, instead of one Cell object per cell.
+        self._values: List[List[object]] = []
+        self._style_ids: List[array] = []
+        # Declared widths are minimums that grow with the content unless the
+        # caller opts out via set_column_widths(..., fit_content=False).
+        self._fit_content = True
         self.column_widths: Dict[int, float] = {}
 
     def append(self, row: Sequence[Union[Cell, Tuple[object, str], object]]) -> None:
@@ -73,28 +82,53 @@ class Sheet:
         self.column_widths: dict[int, float] = {}
 
     def append(self, row: Sequence[Cell | tuple | object]) -> None:
-        processed: List[Cell] = []
-        for item in row:
-            if isinstance(item, Cell):
-                processed.append(item)
-            elif isinstance(item, tuple) and len(item) == 2:
-                processed.append(Cell(item[0], item[1]))
-            else:
-                processed.append(Cell(item))
-        self.rows.append(processed)
+        values, style_ids = _split_row(row)
+        self._values.append(values)
+        self._style_ids.append(style_ids)
+
+    @property
+    def rows(self) -> List[List[Cell]]:
+        """Materialise the stored rows as :class:`Cell` objects.
+
+        Unknown style names were stored as the default style and come back as
+        ``"text"``.
+        """
+
+        return [
+            [Cell(value, STYLE_ORDER[sid]) for value, sid in zip(values, style_ids)]
+            for values, style_ids in zip(self._values, self._style_ids)
+        ]
+
+    def set_column_widths(self, widths: Sequence[float], fit_content: bool = True) -> None:
+        """Declare column widths.
+
+        By default each width is a minimum that still grows to fit the longest
+        value (up to 60 characters). With ``fit_content=False`` the widths are
+        used exactly as given and the sheet is not scanned when it is saved.
+        """
 
-    def set_column_widths(self, widths: Sequence[float]) -> None:
         for index, width in enumerate(widths, start=1):
             self.column_widths[index] = width
+        self._fit_content = fit_content
 
     def computed_widths(self) -> Dict[int, float]:
     def computed_widths(self) -> dict[int, float]:
+        # Find the longest text per column first, then apply the default,
+        # explicit widths and the 60 character cap once per column.
+        longest = [0] * max((len(values) for values in self._values), default=0)
+        for values in self._values:
+            for index, value in enumerate(values):
+                if type(value) is str:
+                    length = len(value)
+                elif value is None:
+                    continue
+                else:
+                    length = len(str(value))
+                if length > longest[index]:
+                    longest[index] = length
         widths = dict(self.column_widths)
-        for row in self.rows:
-            for index, cell in enumerate(row, start=1):
-                text = "" if cell.value is None else str(cell.value)
-                current = widths.get(index, 8.0)
-                widths[index] = min(60.0, max(current, len(text) + 2))
+        for index, length in enumerate(longest, start=1):
+            widths[index] = min(60.0, max(widths.get(index, 8.0), length + 2))
         return widths
 
 
@@ -107,8 +141,8 @@ class WorkbookBuilder:
         self.sheets.append(sheet)
         return sheet
 
-    def save(self, path: Path) -> Path:
-        write_workbook(self.sheets, path)
+    def save(self, path: Path, compresslevel: int = 1) -> Path:
+        write_workbook(self.sheets, path, compresslevel=compresslevel)
         return path
 
 
@@ -130,41 +164,103 @@ STYLE_ORDER = [
 
 STYLE_IDS = {name: index for index, name in enumerate(STYLE_ORDER)}
 
+# Cell markup following the ``r`` attribute value, per style id.
+_EMPTY_CELL_CLOSE = tuple(f'" s="{sid}"/>' for sid in range(len(STYLE_ORDER)))
+_NUMERIC_CELL_OPEN = tuple(f'" s="{sid}"><v>' for sid in range(len(STYLE_ORDER)))
+_TEXT_CELL_OPEN = tuple(f'" t="inlineStr" s="{sid}"><is><t>' for sid in range(len(STYLE_ORDER)))
+
+_SMALL_INT_MIN = -1024
+_SMALL_INT_MAX = 4096
+_SMALL_INT_TEXT = tuple(str(number) for number in range(_SMALL_INT_MIN, _SMALL_INT_MAX))
+
 HEADER_FILL = "FFDEEAF6"
 NET_FILL = "FFFCE4D6"
 BORDER_COLOR = "FFB7B7B7"
+WRITE_BUFFER_SIZE = 64 * 1024
 
 
 def style_id(name: str) -> int:
     return STYLE_IDS.get(name, 0)
 
 
-def write_workbook(sheets: Sequence[Sheet], path: Path) -> None:
+def write_workbook(sheets: Sequence[Sheet], path: Path, compresslevel: int = 1) -> None:
+    """Write ``sheets`` to ``path``.
+
+    Deflate dominates the cost of writing a workbook; level 1 is several times
+    faster than zlib's default for a modestly larger file. Pass a higher
+    ``compresslevel`` for archival exports.
+    """
+
     path.parent.mkdir(parents=True, exist_ok=True)
-    with ZipFile(path, "w", compression=ZIP_DEFLATED) as archive:
-        archive.writestr("[Content_Types].xml", _content_types(len(sheets)))
-        archive.writestr("_rels/.rels", _root_rels())
-        archive.writestr("docProps/core.xml", _core_props())
-        archive.writestr("docProps/app.xml", _app_props(sheets))
-        archive.writestr("xl/_rels/workbook.xml.rels", _workbook_rels(len(sheets)))
-        archive.writestr("xl/workbook.xml", _workbook_xml(sheets))
-        archive.writestr("xl/styles.xml", _styles_xml())
-        archive.writestr("xl/theme/theme1.xml", THEME_XML)
+    with ZipFile(path, "w", compression=ZIP_DEFLATED, compresslevel=compresslevel) as archive:
+        _write_package_parts(archive, sheets)
         for index, sheet in enumerate(sheets, start=1):
-            archive.writestr(f"xl/worksheets/sheet{index}.xml", _sheet_xml(sheet))
+            # The sheet size is unknown until it is written; unlike writestr,
+            # a member opened for writing must opt into zip64 to grow past 2 GiB.
+            with archive.open(f"xl/worksheets/sheet{index}.xml", "w", force_zip64=True) as stream:
+                # Rows are coalesced into one buffer so the compressor sees a
+                # few large writes instead of one small write per row.
+                buffer = bytearray()
+                for chunk in _iter_sheet_xml(sheet):
+                    buffer += chunk.encode("utf-8")
+                    if len(buffer) >= WRITE_BUFFER_SIZE:
+                        stream.write(buffer)
+                        buffer.clear()
+                if buffer:
+                    stream.write(buffer)
+
+
+def _write_package_parts(archive: ZipFile, sheets: Sequence[Sheet]) -> None:
+    archive.writestr("[Content_Types].xml", _content_types(len(sheets)))
+    archive.writestr("_rels/.rels", _ROOT_RELS_BYTES)
+    archive.writestr("docProps/core.xml", _core_props())
+    archive.writestr("docProps/app.xml", _app_props(sheets))
+    archive.writestr("xl/_rels/workbook.xml.rels", _workbook_rels(len(sheets)))
+    archive.writestr("xl/workbook.xml", _workbook_xml(sheets))
+    archive.writestr("xl/styles.xml", _STYLES_XML_BYTES)
+    archive.writestr("xl/theme/theme1.xml", _THEME_XML_BYTES)
+
+
+def _split_row(row: Sequence[Cell | tuple | object]) -> tuple[List[object], array]:
+    values: List[object] = []
+    style_ids = array("B")
+    for item in row:
+        if isinstance(item, Cell):
+            value, style = item.value, item.style
+        elif isinstance(item, tuple) and len(item) == 2:
+            value, style = item
+        else:
+            value, style = item, "text"
+        values.append(value)
+        style_ids.append(style_id(style))
+    return values, style_ids
+
+
+_XML_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&apos;"}
+)
 
 
 def _xml_escape(value: str) -> str:
-    return (
-        value.replace("&", "&amp;")
-        .replace("<", "&lt;")
-        .replace(">", "&gt;")
-        .replace('"', "&quot;")
-        .replace("'", "&apos;")
-    )
+    # Reports repeat the same short labels (tickers, headers, styles) on many
+    # rows; those are served from a bounded cache.
+    if len(value) <= 64:
+        return _xml_escape_cached(value)
+    return value.translate(_XML_ESCAPES)
+
+
+@lru_cache(maxsize=4096)
+def _xml_escape_cached(value: str) -> str:
+    return value.translate(_XML_ESCAPES)
 
 
 def _column_letter(index: int) -> str:
+    if 0 < index <= MAX_COLUMNS:
+        return _COLUMN_LETTERS[index - 1]
+    return _column_letter_slow(index)
+
+
+def _column_letter_slow(index: int) -> str:
     result = ""
     while index:
         index, remainder = divmod(index - 1, 26)
@@ -172,6 +268,13 @@ def _column_letter(index: int) -> str:
     return result or "A"
 
 
+# Excel caps a sheet at XFD (16384) columns; every valid name is built once so
+# the per-cell lookup is a tuple index rather than a divmod loop.
+MAX_COLUMNS = 16384
+_COLUMN_LETTERS = tuple(_column_letter_slow(index) for index in range(1, MAX_COLUMNS + 1))
+
+
+@lru_cache(maxsize=32)
 def _content_types(sheet_count: int) -> str:
     overrides = "".join(
         f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
@@ -217,7 +320,7 @@ def _root_rels() -> str:
 
 def _workbook_xml(sheets: Sequence[Worksheet]) -> str:
     sheet_entries = "".join(
-        f'<sheet name="{escape(sheet.name)}" sheetId="{idx}" r:id="rId{idx}"/>'
+        f'<sheet name="{_xml_escape(sheet.name)}" sheetId="{idx}" r:id="rId{idx}"/>'
         for idx, sheet in enumerate(sheets, start=1)
     )
     return (
@@ -245,18 +348,21 @@ def _workbook_rels(sheets: Sequence[Worksheet]) -> str:
         "</Relationships>"
 
 def _core_props() -> str:
-    timestamp = datetime.utcnow().isoformat(timespec="seconds") + "Z"
-    return (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<cp:coreProperties xmlns:cp=\"http://schemas.openxmlformats.org/package/2006/metadata/core-properties\" "
-        "xmlns:dc=\"http://purl.org/dc/elements/1.1/\" xmlns:dcterms=\"http://purl.org/dc/terms/\" "
-        "xmlns:dcmitype=\"http://purl.org/dc/dcmitype/\" xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\">"
-        "<dc:creator>options-trader</dc:creator>"
-        "<cp:lastModifiedBy>options-trader</cp:lastModifiedBy>"
-        f"<dcterms:created xsi:type=\"dcterms:W3CDTF\">{timestamp}</dcterms:created>"
-        f"<dcterms:modified xsi:type=\"dcterms:W3CDTF\">{timestamp}</dcterms:modified>"
-        "</cp:coreProperties>"
-    )
+    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return _CORE_PROPS_TEMPLATE.replace("{timestamp}", timestamp)
+
+
+_CORE_PROPS_TEMPLATE = (
+    "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
+    "<cp:coreProperties xmlns:cp=\"http://schemas.openxmlformats.org/package/2006/metadata/core-properties\" "
+    "xmlns:dc=\"http://purl.org/dc/elements/1.1/\" xmlns:dcterms=\"http://purl.org/dc/terms/\" "
+    "xmlns:dcmitype=\"http://purl.org/dc/dcmitype/\" xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\">"
+    "<dc:creator>options-trader</dc:creator>"
+    "<cp:lastModifiedBy>options-trader</cp:lastModifiedBy>"
+    "<dcterms:created xsi:type=\"dcterms:W3CDTF\">{timestamp}</dcterms:created>"
+    "<dcterms:modified xsi:type=\"dcterms:W3CDTF\">{timestamp}</dcterms:modified>"
+    "</cp:coreProperties>"
+)
 
 
 def _app_props(sheets: Sequence[Sheet]) -> str:
@@ -273,6 +379,7 @@ def _app_props(sheets: Sequence[Sheet]) -> str:
     )
 
 
+@lru_cache(maxsize=32)
 def _workbook_rels(sheet_count: int) -> str:
     relationships = []
     for index in range(1, sheet_count + 1):
@@ -379,15 +486,16 @@ def _worksheet_xml(rows: Sequence[Sequence[object]]) -> str:
         "<sheetData>",
     ]
     for row_idx, row in enumerate(rows, start=1):
-        lines.append(f'<row r="{row_idx}">')
+        row_str = str(row_idx)
+        lines.append(f'<row r="{row_str}">')
         for col_idx, value in enumerate(row, start=1):
-            cell_ref = f"{_column_name(col_idx)}{row_idx}"
+            cell_ref = _column_name(col_idx) + row_str
             if value is None:
                 continue
             if isinstance(value, (int, float)):
                 lines.append(f'<c r="{cell_ref}"><v>{value}</v></c>')
             else:
-                escaped = escape(str(value))
+                escaped = _xml_escape(str(value))
                 lines.append(
                     f'<c r="{cell_ref}" t="inlineStr"><is><t>{escaped}</t></is></c>'
                 )
@@ -397,6 +505,8 @@ def _worksheet_xml(rows: Sequence[Sequence[object]]) -> str:
 
 
 def _column_name(idx: int) -> str:
+    if 0 < idx <= MAX_COLUMNS:
+        return _COLUMN_LETTERS[idx - 1]
     letters = ""
     while idx:
         idx, remainder = divmod(idx - 1, 26)
@@ -407,7 +517,17 @@ def _column_name(idx: int) -> str:
 __all__ = ["Workbook"]
 
 def _sheet_xml(sheet: Sheet) -> str:
-    rows = sheet.rows
+    return "".join(_iter_sheet_xml(sheet))
+
+
+def _iter_sheet_xml(sheet: Sheet) -> Iterator[str]:
+    """Yield the worksheet XML one row at a time.
+
+    ``write_workbook`` feeds the chunks straight into the zip member so the
+    full sheet document never has to be held in memory.
+    """
+
+    rows = sheet._values
     if rows:
         max_cols = max(len(row) for row in rows)
         max_rows = len(rows)
@@ -416,35 +536,29 @@ def _sheet_xml(sheet: Sheet) -> str:
         max_cols = 1
         max_rows = 0
         dimension = "A1"
+    if max_cols <= MAX_COLUMNS:
+        letters = _COLUMN_LETTERS
+    else:
+        letters = tuple(_column_letter(index) for index in range(1, max_cols + 1))
+
+    # Fixed layouts skip the pass over every cell that content sizing needs.
+    if sheet._fit_content:
+        width_map = sheet.computed_widths()
+    else:
+        width_map = dict(sheet.column_widths)
+    yield _sheet_header(width_map, dimension)
+    for row_index, (values, style_ids) in enumerate(zip(rows, sheet._style_ids), start=1):
+        yield _row_xml(row_index, values, style_ids, letters)
+    yield _SHEET_FOOTER
 
-    width_map = sheet.computed_widths()
+
+def _sheet_header(width_map: dict[int, float], dimension: str) -> str:
     cols_xml = "".join(
         f"<col min=\"{idx}\" max=\"{idx}\" width=\"{width:.2f}\" customWidth=\"1\"/>"
         for idx, width in sorted(width_map.items())
     )
     if cols_xml:
         cols_xml = f"<cols>{cols_xml}</cols>"
-
-    sheet_rows = []
-    for row_index, row in enumerate(rows, start=1):
-        cells_xml = []
-        for col_index, cell in enumerate(row, start=1):
-            ref = f"{_column_letter(col_index)}{row_index}"
-            sid = style_id(cell.style)
-            value = cell.value
-            if value is None or value == "":
-                cells_xml.append(f'<c r="{ref}" s="{sid}"/>')
-            elif isinstance(value, (int, float)):
-                cells_xml.append(f'<c r="{ref}" s="{sid}"><v>{value}</v></c>')
-            else:
-                text = _xml_escape(str(value))
-                cells_xml.append(
-                    f'<c r="{ref}" t="inlineStr" s="{sid}"><is><t>{text}</t></is></c>'
-                )
-        sheet_rows.append(f'<row r="{row_index}">{"".join(cells_xml)}</row>')
-
-    sheet_data = "".join(sheet_rows)
-
     return (
         "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
         "<worksheet xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\" "
@@ -453,12 +567,48 @@ def _sheet_xml(sheet: Sheet) -> str:
         "<sheetViews><sheetView workbookViewId=\"0\"/></sheetViews>"
         "<sheetFormatPr defaultRowHeight=\"15\"/>"
         f"{cols_xml}"
-        f"<sheetData>{sheet_data}</sheetData>"
-        "<pageMargins left=\"0.7\" right=\"0.7\" top=\"0.75\" bottom=\"0.75\" header=\"0.3\" footer=\"0.3\"/>"
-        "</worksheet>"
+        "<sheetData>"
     )
 
 
+def _row_xml(row_index: int, values: Sequence[object], style_ids: array, letters: Sequence[str]) -> str:
+    row_str = str(row_index)
+    cells_xml = []
+    for col_index, value in enumerate(values):
+        ref = letters[col_index] + row_str
+        sid = style_ids[col_index]
+        value_type = type(value)
+        # Plain ints and floats are the bulk of a report; test them by
+        # identity before the general checks. Whole floats (strikes, share
+        # counts) are written as integers, skipping the float formatter.
+        if value_type is float and value.is_integer() and -1e15 < value < 1e15:
+            value = int(value)
+            value_type = int
+        if value_type is int:
+            if _SMALL_INT_MIN <= value < _SMALL_INT_MAX:
+                number = _SMALL_INT_TEXT[value - _SMALL_INT_MIN]
+            else:
+                number = str(value)
+            cells_xml.append(f'<c r="{ref}{_NUMERIC_CELL_OPEN[sid]}{number}</v></c>')
+        elif value_type is float:
+            cells_xml.append(f'<c r="{ref}{_NUMERIC_CELL_OPEN[sid]}{value}</v></c>')
+        elif value is None or value == "":
+            cells_xml.append(f'<c r="{ref}{_EMPTY_CELL_CLOSE[sid]}')
+        elif isinstance(value, (int, float)):
+            cells_xml.append(f'<c r="{ref}{_NUMERIC_CELL_OPEN[sid]}{value}</v></c>')
+        else:
+            text = _xml_escape(str(value))
+            cells_xml.append(f'<c r="{ref}{_TEXT_CELL_OPEN[sid]}{text}</t></is></c>')
+    return f'<row r="{row_str}">{"".join(cells_xml)}</row>'
+
+
+_SHEET_FOOTER = (
+    "</sheetData>"
+    "<pageMargins left=\"0.7\" right=\"0.7\" top=\"0.75\" bottom=\"0.75\" header=\"0.3\" footer=\"0.3\"/>"
+    "</worksheet>"
+)
+
+
 THEME_XML = (
     "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
     "<a:theme xmlns:a=\"http://schemas.openxmlformats.org/drawingml/2006/main\" name=\"Office Theme\">"
@@ -492,3 +642,8 @@ THEME_XML = (
     "<a:extraClrSchemeLst/>"
     "</a:theme>"
 )
+
+# The fixed package parts are identical for every workbook; encode them once.
+_ROOT_RELS_BYTES = _root_rels().encode("utf-8")
+_STYLES_XML_BYTES = _styles_xml().encode("utf-8")
+_THEME_XML_BYTES = THEME_XML.encode("utf-8")
@@ -8,3 +8,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_PATH = PROJECT_ROOT / "src"
 if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
+
+
+def pytest_configure(config) -> None:
+    config.addinivalue_line("markers", "strategy: strategy engine tests (select with -m strategy)")
@@ -1,155 +1,153 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
-from pathlib import Path
-import zipfile
-import xml.etree.ElementTree as ET
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from zipfile import ZipFile
+
+try:  # lxml parses the sheets in C; the stdlib parser has the same API here.
+    from lxml import etree as ET
+except ImportError:  # pragma: no cover - optional dependency
+    from xml.etree import ElementTree as ET
+
+import pytest
 
 from options_trader.data import OptionQuote
 from options_trader.reporting import export_results_to_excel, summarize_results
 from options_trader.strategy import StrategyResult
+from options_trader.xlsx import Cell, WorkbookBuilder
 
+# Clark-notation names avoid resolving namespace prefixes on every lookup.
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_SHEET_TAG = f"{_MAIN_NS}sheet"
+_ROW_TAG = f"{_MAIN_NS}row"
+_CELL_TAG = f"{_MAIN_NS}c"
+_COL_TAG = f"{_MAIN_NS}col"
+_VALUE_TAG = f"{_MAIN_NS}v"
+_INLINE_TEXT_PATH = f"{_MAIN_NS}is/{_MAIN_NS}t"
 
-def _quote(option_type: str, strike: float, expiry: date) -> OptionQuote:
-    return OptionQuote(
-        contract_symbol=f"TEST{option_type}{strike}",
-        ticker="AAPL",
-        expiry=expiry,
-        option_type=option_type,
-        strike=strike,
-        bid=5.0,
-        ask=5.4,
-        last=5.2,
-        implied_volatility=0.25,
-    )
+RUN_TIME = datetime(2024, 1, 3, 16, 30, tzinfo=timezone.utc)
 
 
-def _result() -> StrategyResult:
-    expiry = date.today() + timedelta(days=150)
-    call_quote = _quote("C", 100.0, expiry)
-    put_quote = _quote("P", 90.0, expiry)
-    return StrategyResult(
-        ticker="AAPL",
-        spot=102.0,
-        expiry=expiry,
-        days_to_expiry=150,
-        call_quote=call_quote,
-        put_quote=put_quote,
-        put_variation=0.0,
-        net_premium=200.0,
-        net_premium_per_share=2.0,
-        capital_required=17800.0,
-        annualized_yield=0.035,
-        effective_entry=89.0,
-    )
-
-
-def test_summarize_results_formats_table() -> None:
-    output = summarize_results([_result()])
-    assert "Ticker" in output
-    assert "AAPL" in output
-
-
-def test_export_results_to_excel_creates_summary_and_detail(tmp_path: Path) -> None:
-    result = _result()
-    run_time = datetime(2025, 1, 15, 16, 30, 0)
-    path = tmp_path / "report.xlsx"
-    export_results_to_excel([result], "AAPL [Automatic]", run_time, path)
-    summary_rows = _read_sheet(path, "Summary")
-    assert summary_rows[0][2] == "Ticker"
-    assert summary_rows[1][2] == "AAPL"
-    assert summary_rows[1][0] == "AAPL [Automatic]"
-    detail_rows = _read_sheet(path, "AAPL")
-    assert detail_rows[0][2] == "Ticker"
-    assert detail_rows[1][2] == "AAPL"
-
-
-def test_export_results_handles_empty_results(tmp_path: Path) -> None:
-    run_time = datetime(2025, 1, 15, 16, 30, 0)
-    path = tmp_path / "empty.xlsx"
-    export_results_to_excel([], "Empty Query", run_time, path)
-    summary_rows = _read_sheet(path, "Summary")
-    assert summary_rows[1][0] == "Empty Query"
-    assert summary_rows[0][2] == "Message"
-
-
-def _read_sheet(path: Path, sheet_name: str) -> list[list[str | float]]:
-    with zipfile.ZipFile(path, "r") as zf:
-        workbook_xml = ET.fromstring(zf.read("xl/workbook.xml"))
-        ns = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
-        sheet_element = None
-        for sheet in workbook_xml.find("m:sheets", ns):
-            if sheet.attrib.get("name") == sheet_name:
-                sheet_element = sheet
-                break
-        if sheet_element is None:
-            raise KeyError(sheet_name)
-        sheet_id = sheet_element.attrib["sheetId"]
-        sheet_xml = ET.fromstring(zf.read(f"xl/worksheets/sheet{sheet_id}.xml"))
-        rows: list[list[str | float]] = []
-        for row in sheet_xml.findall("m:sheetData/m:row", ns):
-            cells: list[str | float] = []
-            for cell in row.findall("m:c", ns):
-                cell_type = cell.attrib.get("t")
-                if cell_type == "inlineStr":
-                    text_node = cell.find("m:is/m:t", ns)
-                    cells.append(text_node.text if text_node is not None else "")
-                else:
-                    value = cell.find("m:v", ns)
-                    if value is None:
-                        cells.append("")
-                    else:
-                        try:
-                            cells.append(float(value.text))
-                        except (TypeError, ValueError):
-                            cells.append(value.text or "")
-            rows.append(cells)
-    return rows
+def _sheet_cells(path, index):
+    _, rows_by_id = _open_book(path)
+    return _SheetCells(rows_by_id[str(index)])
+
+
+class _SheetCells:
+    """Look up parsed cells by A1 reference without building a dict per sheet."""
+
+    def __init__(self, rows: list[list[tuple[str, object]]]) -> None:
+        self._rows = rows
+
+    def __getitem__(self, ref: str) -> object:
+        column, row_number = _split_ref(ref)
+        # The writer emits every row and cell in order, so try the positional
+        # slot first and only scan when the sheet is sparse.
+        if 0 < row_number <= len(self._rows):
+            row = self._rows[row_number - 1]
+            if 0 < column <= len(row) and row[column - 1][0] == ref:
+                return row[column - 1][1]
+        for row in self._rows:
+            for cell_ref, value in row:
+                if cell_ref == ref:
+                    return value
+        raise KeyError(ref)
+
+
+def _split_ref(ref: str) -> tuple[int, int]:
+    column = 0
+    for index, char in enumerate(ref):
+        if "A" <= char <= "Z":
+            column = column * 26 + ord(char) - 64
+        else:
+            return column, int(ref[index:])
+    raise KeyError(ref)
 
-from datetime import datetime, timezone
-from xml.etree import ElementTree as ET
-from zipfile import ZipFile
 
-import pytest
+def _sheet_names(path):
+    sheets, _ = _open_book(path)
+    return [name for name, _ in sheets]
 
-from options_trader.data import OptionQuote
-from options_trader.reporting import export_results_to_excel
-from options_trader.strategy import StrategyResult
 
-_NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+def _open_book(path):
+    """Return ``((name, sheetId), ...)`` and the ``(ref, value)`` rows per sheetId.
 
+    Tests read the same exported file several times, so the whole workbook is
+    parsed once per file version from a single open archive.
+    """
 
-def _sheet_cells(path, index):
-    with ZipFile(path) as archive:
-        data = archive.read(f"xl/worksheets/sheet{index}.xml")
-    root = ET.fromstring(data)
-    cells: dict[str, object] = {}
-    for cell in root.findall(".//x:sheetData/x:row/x:c", _NS):
-        ref = cell.attrib.get("r", "")
-        if cell.get("t") == "inlineStr":
-            text = cell.find("x:is/x:t", _NS)
-            cells[ref] = text.text if text is not None else ""
-        else:
-            value = cell.find("x:v", _NS)
-            if value is None or value.text is None:
-                cells[ref] = ""
-            else:
-                raw = value.text
-                try:
-                    cells[ref] = float(raw)
-                except ValueError:
-                    cells[ref] = raw
-    return cells
+    return _load_book(str(path), os.stat(path).st_mtime_ns)
 
 
-def _sheet_names(path):
+@lru_cache(maxsize=8)
+def _load_book(path: str, mtime_ns: int):
     with ZipFile(path) as archive:
-        data = archive.read("xl/workbook.xml")
-    root = ET.fromstring(data)
-    return [sheet.attrib.get("name", "") for sheet in root.findall(".//x:sheet", _NS)]
+        with archive.open("xl/workbook.xml") as stream:
+            root = ET.parse(stream).getroot()
+        sheets = tuple(
+            (sheet.attrib.get("name", ""), sheet.attrib.get("sheetId", ""))
+            for sheet in root.iter(_SHEET_TAG)
+        )
+        rows_by_id = {sheet_id: _parse_sheet_rows(archive, sheet_id) for _, sheet_id in sheets}
+    return sheets, rows_by_id
+
+
+def _parse_sheet_rows(archive: ZipFile, sheet_id: str) -> list[list[tuple[str, object]]]:
+    rows: list[list[tuple[str, object]]] = []
+    cells: list[tuple[str, object]] = []
+    with archive.open(f"xl/worksheets/sheet{sheet_id}.xml") as stream:
+        # Stream the sheet and drop each row once read instead of building the DOM.
+        for _, element in ET.iterparse(stream, events=("end",)):
+            if element.tag == _ROW_TAG:
+                rows.append(cells)
+                cells = []
+                element.clear()
+                continue
+            if element.tag == _CELL_TAG:
+                cells.append((element.get("r", ""), _cell_value(element)))
+    return rows
 
 
-def _sample_result() -> StrategyResult:
+def _column_widths(path, index) -> dict[int, float]:
+    with ZipFile(path) as archive, archive.open(f"xl/worksheets/sheet{index}.xml") as stream:
+        root = ET.parse(stream).getroot()
+    return {int(col.get("min")): float(col.get("width")) for col in root.iter(_COL_TAG)}
+
+
+def _sheet_cell(path, index, ref):
+    """Stream one sheet only as far as ``ref`` for single-cell checks."""
+
+    with ZipFile(path) as archive, archive.open(f"xl/worksheets/sheet{index}.xml") as stream:
+        for _, element in ET.iterparse(stream, events=("end",)):
+            if element.tag == _CELL_TAG and element.get("r") == ref:
+                return _cell_value(element)
+            if element.tag == _ROW_TAG:
+                element.clear()
+    raise KeyError(ref)
+
+
+def _cell_value(element) -> object:
+    cell_type = element.get("t")
+    if cell_type == "inlineStr":
+        text = element.find(_INLINE_TEXT_PATH)
+        return text.text if text is not None else ""
+    value = element.find(_VALUE_TAG)
+    raw = value.text if value is not None else None
+    if raw is None:
+        return ""
+    if cell_type is None or cell_type == "n":
+        # Only numeric cells reach float(); strings never raise here.
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+@pytest.fixture(scope="module")
+def sample_result() -> StrategyResult:
+    # StrategyResult and OptionQuote are frozen, so one instance can be shared.
     valuation_time = datetime(2024, 1, 2, 15, 30, tzinfo=timezone.utc)
     expiry = datetime(2024, 6, 21, tzinfo=timezone.utc)
     call_quote = OptionQuote(
@@ -208,45 +206,111 @@ def _sample_result() -> StrategyResult:
     )
 
 
-def test_export_results_creates_structured_workbook(tmp_path):
-    result = _sample_result()
-    run_time = datetime(2024, 1, 3, 16, 30, tzinfo=timezone.utc)
-    path = tmp_path / "report.xlsx"
+@pytest.fixture(scope="module")
+def report_path(tmp_path_factory, sample_result):
+    # Exporting dominates these tests; write the workbook once and let each
+    # test inspect the same file.
+    path = tmp_path_factory.mktemp("report") / "report.xlsx"
+    export_results_to_excel([sample_result], "AAPL [Automatic]", RUN_TIME, path)
+    return path
 
-    export_results_to_excel([result], "AAPL [Automatic]", run_time, path)
 
-    names = _sheet_names(path)
+def test_summarize_results_formats_table(sample_result):
+    output = summarize_results([sample_result])
+    assert "Ticker: AAPL" in output
+
+
+def test_export_results_creates_structured_workbook(report_path):
+    names = _sheet_names(report_path)
     assert names[0] == "Summary"
     assert any(name.startswith("AAPL_") for name in names[1:])
 
-    summary = _sheet_cells(path, 1)
-    assert summary["A2"] == "AAPL [Automatic]"
-    assert summary["B2"] == "2024-01-03"
-    assert summary["C2"] == "16:30:00"
-    assert summary["D2"] == "AAPL"
-    assert summary["H2"] == pytest.approx(0.12)
-    assert summary["I2"] == pytest.approx(result.net_premium)
 
-    detail = _sheet_cells(path, 2)
-    assert detail["B5"] == "AAPL"
-    assert detail["B6"] == pytest.approx(140.0)
-    assert detail["I14"] == pytest.approx(result.put_premium)
-    assert detail["I15"] == pytest.approx(-result.call_premium)
-    assert detail["I16"] == pytest.approx(result.net_premium)
-    assert detail["B18"] == pytest.approx(result.capital_at_risk)
-    assert detail["B19"] == pytest.approx(0.12)
+# (sheet index, cell reference, expected value) checked against the shared
+# report; sheet 1 is the summary and sheet 2 the AAPL detail sheet.
+_REPORT_CELLS = [
+    (1, "A2", "AAPL [Automatic]"),
+    (1, "B2", "2024-01-03"),
+    (1, "C2", "16:30:00"),
+    (1, "D2", "AAPL"),
+    (1, "H2", pytest.approx(0.12)),
+    (1, "I2", pytest.approx(1400.0)),
+    (2, "B5", "AAPL"),
+    (2, "B6", pytest.approx(140.0)),
+    (2, "I14", pytest.approx(2000.0)),
+    (2, "I15", pytest.approx(-600.0)),
+    (2, "I16", pytest.approx(1400.0)),
+    (2, "B18", pytest.approx(27000.0)),
+    (2, "B19", pytest.approx(0.12)),
+]
+
+
+@pytest.mark.parametrize("index, ref, expected", _REPORT_CELLS)
+def test_export_results_report_cell(report_path, index, ref, expected):
+    assert _sheet_cells(report_path, index)[ref] == expected
 
 
 def test_export_results_handles_empty_runs(tmp_path):
-    run_time = datetime(2024, 1, 3, 16, 30, tzinfo=timezone.utc)
     path = tmp_path / "empty.xlsx"
 
-    export_results_to_excel([], "AAPL [Automatic]", run_time, path)
+    export_results_to_excel([], "AAPL [Automatic]", RUN_TIME, path)
 
     names = _sheet_names(path)
     assert names == ["Summary"]
 
-    summary = _sheet_cells(path, 1)
-    assert summary["A2"] == "AAPL [Automatic]"
-    assert summary["D2"] == "No qualifying trades"
-
+    assert _sheet_cell(path, 1, "A2") == "AAPL [Automatic]"
+    assert _sheet_cell(path, 1, "D2") == "No qualifying trades"
+
+
+def test_export_results_widens_columns_for_long_labels(tmp_path):
+    path = tmp_path / "wide.xlsx"
+
+    export_results_to_excel([], "AAPL, MSFT, GOOGL, META [Automatic]", RUN_TIME, path)
+
+    widths = _column_widths(path, 1)
+    # Declared widths are minimums; long values still widen their column.
+    assert widths[1] == pytest.approx(len("AAPL, MSFT, GOOGL, META [Automatic]") + 2)
+    assert widths[4] == pytest.approx(len("No qualifying trades") + 2)
+    assert widths[2] == pytest.approx(12.0)
+
+
+def test_fixed_column_widths_are_used_as_given(tmp_path):
+    path = tmp_path / "fixed.xlsx"
+    builder = WorkbookBuilder()
+    sheet = builder.add_sheet("Fixed")
+    sheet.append(["a label much wider than its column", 1.5])
+    sheet.set_column_widths([10, 8], fit_content=False)
+
+    builder.save(path)
+
+    assert _column_widths(path, 1) == {1: 10.0, 2: 8.0}
+
+
+def test_workbook_builder_round_trips_values(tmp_path):
+    path = tmp_path / "round_trip.xlsx"
+    builder = WorkbookBuilder()
+    first = builder.add_sheet("First")
+    first.append([Cell("Label", "header"), ("Value", "header"), "Note"])
+    first.append(["integer", 42, None])
+    first.append(["large", 123456789, "R&D <draft>"])
+    first.append(["whole float", -250.0, ""])
+    first.append(["fraction", Cell(0.125, "percent"), "ok"])
+    second = builder.add_sheet("Second")
+    for index in range(1, 201):
+        second.append([f"row {index}", index * 1.5])
+
+    builder.save(path)
+
+    assert _sheet_names(path) == ["First", "Second"]
+    cells = _sheet_cells(path, 1)
+    assert [cells["A1"], cells["B1"], cells["C1"]] == ["Label", "Value", "Note"]
+    assert cells["B2"] == 42.0
+    assert cells["C2"] == ""
+    assert cells["B3"] == 123456789.0
+    assert cells["C3"] == "R&D <draft>"
+    assert cells["B4"] == -250.0
+    assert cells["B5"] == pytest.approx(0.125)
+    rows = _sheet_cells(path, 2)
+    assert rows["A200"] == "row 200"
+    assert rows["B200"] == pytest.approx(300.0)
+    assert rows["B1"] == pytest.approx(1.5)
@@ -1,240 +1,334 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import date, timedelta
-from typing import Dict, List, Sequence
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from options_trader.data import OptionChain, OptionQuote
+from options_trader.config import StrategyConfig
+from options_trader.data import MarketData, MarketDataClient, OptionChainSlice, OptionQuote
 from options_trader.strategy import StrategyEngine, StrategyParameters
 
 
-@dataclass
-class StubDataClient:
-    spot: Dict[str, float]
-    chains: Dict[tuple[str, date], OptionChain]
-    expiries: Dict[str, Sequence[date]]
+pytestmark = pytest.mark.strategy
 
-    def spot_price(self, ticker: str) -> float:
-        return self.spot[ticker]
+_HISTORICAL_PRICES = tuple(range(141, 151))
 
-    def expirations(self, ticker: str) -> Sequence[date]:
-        return self.expiries[ticker]
+# Expected premiums for the 120-day dummy chain (call 150 @ 6.00, put 135 @
+# 10.00) under the default contract structure.
+_DEFAULTS = StrategyParameters()
+_EXPECTED_CALL_PREMIUM = 6.0 * _DEFAULTS.contract_size * _DEFAULTS.call_contracts
+_EXPECTED_PUT_PREMIUM = 10.0 * _DEFAULTS.contract_size * _DEFAULTS.put_contracts
+_EXPECTED_CAPITAL_AT_RISK = 135.0 * _DEFAULTS.contract_size * _DEFAULTS.put_contracts
 
-    def option_chain(self, ticker: str, expiry: date) -> OptionChain:
-        return self.chains[(ticker, expiry)]
 
+class DummyMarketDataClient(MarketDataClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.valuation_time = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        self._data = MarketData(
+            ticker="ABC",
+            spot_price=float(_HISTORICAL_PRICES[-1]),
+            valuation_date=self.valuation_time,
+            historical_prices=_HISTORICAL_PRICES,
+        )
+        self._cache: dict[str, MarketData] = {}
 
-@pytest.fixture
-def stub_client() -> StubDataClient:
-    today = date.today()
-    expiry_short = today + timedelta(days=120)
-    expiry_long = today + timedelta(days=210)
+    def fetch(self, ticker: str) -> MarketData:  # type: ignore[override]
+        # MarketData is frozen and the price history is a tuple, so one
+        # instance per ticker can be handed to every caller.
+        data = self._cache.get(ticker)
+        if data is None:
+            data = MarketData(
+                ticker=ticker,
+                spot_price=self._data.spot_price,
+                valuation_date=self.valuation_time,
+                historical_prices=_HISTORICAL_PRICES,
+            )
+            self._cache[ticker] = data
+        return data
 
-    def call_quote(expiry: date, strike: float, bid: float, ask: float, iv: float) -> OptionQuote:
-        return OptionQuote(
-            contract_symbol=f"{expiry:%Y%m%d}C{strike}",
-            ticker="AAPL",
-            expiry=expiry,
-            option_type="call",
-            strike=strike,
-            bid=bid,
-            ask=ask,
-            last=(bid + ask) / 2,
-            implied_volatility=iv,
-        )
 
-    def put_quote(expiry: date, strike: float, bid: float, ask: float, iv: float) -> OptionQuote:
-        return OptionQuote(
-            contract_symbol=f"{expiry:%Y%m%d}P{strike}",
-            ticker="AAPL",
-            expiry=expiry,
-            option_type="put",
-            strike=strike,
-            bid=bid,
-            ask=ask,
-            last=(bid + ask) / 2,
-            implied_volatility=iv,
-        )
+class DummyOptionChainClient:
+    def __init__(self, valuation_time: datetime, ticker: str = "ABC") -> None:
+        self.valuation_time = valuation_time
+        self.expiry_1 = valuation_time + timedelta(days=120)
+        self.expiry_2 = valuation_time + timedelta(days=150)
+        # The chains are static, so build each slice once and hand out the
+        # same read-only instance on every fetch.
+        self._chains = {
+            self.expiry_1: OptionChainSlice(
+                ticker=ticker,
+                expiry=self.expiry_1,
+                calls=[
+                    OptionQuote(
+                        ticker=ticker,
+                        expiry=self.expiry_1,
+                        strike=150.0,
+                        option_type="call",
+                        bid=5.5,
+                        ask=6.5,
+                        last_price=6.0,
+                        implied_volatility=0.24,
+                    )
+                ],
+                puts=[
+                    OptionQuote(
+                        ticker=ticker,
+                        expiry=self.expiry_1,
+                        strike=135.0,
+                        option_type="put",
+                        bid=9.5,
+                        ask=10.5,
+                        last_price=10.0,
+                        implied_volatility=0.28,
+                    ),
+                    OptionQuote(
+                        ticker=ticker,
+                        expiry=self.expiry_1,
+                        strike=130.0,
+                        option_type="put",
+                        bid=7.0,
+                        ask=7.6,
+                        last_price=7.3,
+                        implied_volatility=0.27,
+                    ),
+                ],
+            ),
+            self.expiry_2: OptionChainSlice(
+                ticker=ticker,
+                expiry=self.expiry_2,
+                calls=[
+                    OptionQuote(
+                        ticker=ticker,
+                        expiry=self.expiry_2,
+                        strike=150.0,
+                        option_type="call",
+                        bid=4.8,
+                        ask=5.2,
+                        last_price=5.0,
+                        implied_volatility=0.22,
+                    )
+                ],
+                puts=[
+                    OptionQuote(
+                        ticker=ticker,
+                        expiry=self.expiry_2,
+                        strike=135.0,
+                        option_type="put",
+                        bid=8.0,
+                        ask=8.6,
+                        last_price=8.3,
+                        implied_volatility=0.25,
+                    ),
+                ],
+            ),
+        }
 
-    chain_short = OptionChain(
-        expiry=expiry_short,
-        calls=[
-            call_quote(expiry_short, 95.0, 6.8, 7.2, 0.28),
-            call_quote(expiry_short, 100.0, 6.0, 6.4, 0.26),
-        ],
-        puts=[
-            put_quote(expiry_short, 85.0, 3.8, 4.2, 0.25),
-            put_quote(expiry_short, 90.0, 4.5, 4.7, 0.24),
-            put_quote(expiry_short, 95.0, 5.4, 5.8, 0.23),
-        ],
-    )
-    chain_long = OptionChain(
-        expiry=expiry_long,
-        calls=[
-            call_quote(expiry_long, 100.0, 7.4, 7.8, 0.27),
-            call_quote(expiry_long, 105.0, 6.8, 7.2, 0.27),
-        ],
-        puts=[
-            put_quote(expiry_long, 90.0, 5.0, 5.4, 0.24),
-            put_quote(expiry_long, 95.0, 5.8, 6.2, 0.23),
-        ],
-    )
+    def list_expiries(self, ticker: str):  # type: ignore[override]
+        return [self.expiry_1, self.expiry_2]
 
-    return StubDataClient(
-        spot={"AAPL": 100.0},
-        chains={
-            ("AAPL", expiry_short): chain_short,
-            ("AAPL", expiry_long): chain_long,
-        },
-        expiries={"AAPL": [expiry_short, expiry_long]},
-    )
+    def fetch_chain(self, ticker: str, expiry: datetime):  # type: ignore[override]
+        return self._chains[expiry]
 
 
-def test_best_result_prefers_higher_yield(stub_client: StubDataClient) -> None:
-    engine = StrategyEngine(data_client=stub_client)
-    params = StrategyParameters(min_days=100, max_days=250)
-    results = engine.evaluate("AAPL", params)
-    assert len(results) == 2
-    best = engine.best_result("AAPL", params)
-    assert best is not None
-    assert best == results[0]
-    assert results[0].days_to_expiry < results[1].days_to_expiry
-    assert results[0].annualized_yield > results[1].annualized_yield
+class CountingOptionChainClient(DummyOptionChainClient):
+    def __init__(self, valuation_time: datetime) -> None:
+        super().__init__(valuation_time)
+        self.fetch_count = 0
+        # The engine fetches chains from pool threads; += is not atomic.
+        self._lock = threading.Lock()
 
+    def fetch_chain(self, ticker: str, expiry: datetime):  # type: ignore[override]
+        with self._lock:
+            self.fetch_count += 1
+        return super().fetch_chain(ticker, expiry)
+
+
+class MultiStrikeOptionChainClient:
+    """One 120-day expiry listing calls either side of spot and a ladder of puts."""
+
+    def __init__(self, valuation_time: datetime, ticker: str = "ABC") -> None:
+        self.expiry = valuation_time + timedelta(days=120)
+
+        def quote(strike: float, option_type: str, price: float) -> OptionQuote:
+            return OptionQuote(
+                ticker=ticker,
+                expiry=self.expiry,
+                strike=strike,
+                option_type=option_type,
+                bid=price - 0.5,
+                ask=price + 0.5,
+                last_price=price,
+                implied_volatility=0.25,
+            )
+
+        self._chain = OptionChainSlice(
+            ticker=ticker,
+            expiry=self.expiry,
+            calls=[quote(155.0, "call", 4.0), quote(145.0, "call", 8.0)],
+            puts=[quote(strike, "put", strike / 15) for strike in (125.0, 130.0, 135.0, 140.0)],
+        )
 
-def test_put_variations_produce_distinct_strikes(stub_client: StubDataClient) -> None:
-    engine = StrategyEngine(data_client=stub_client)
-    params = StrategyParameters(
-        min_days=100,
-        max_days=150,
-        put_strike_variation=(-0.05, 0.0, 0.05),
-    )
-    results = engine.evaluate("AAPL", params)
-    strikes = {result.put_quote.strike for result in results}
-    assert strikes == {85.0, 90.0, 95.0}
+    def list_expiries(self, ticker: str):  # type: ignore[override]
+        return [self.expiry]
+
+    def fetch_chain(self, ticker: str, expiry: datetime):  # type: ignore[override]
+        return self._chain
 
 
-def test_volatility_filters_remove_trades(stub_client: StubDataClient) -> None:
-    engine = StrategyEngine(data_client=stub_client)
-    params = StrategyParameters(min_days=100, max_days=150, min_volatility=0.26)
-    results = engine.evaluate("AAPL", params)
-    assert results == []
+class RecordingOptionChainClient(DummyOptionChainClient):
+    """Fails for ``BAD`` and records which threads list expiries and fetch chains."""
 
-from datetime import datetime, timedelta, timezone
+    def __init__(self, valuation_time: datetime) -> None:
+        super().__init__(valuation_time)
+        self.expiry_threads: list[str] = []
+        self.chain_threads: list[str] = []
 
-import pytest
+    def list_expiries(self, ticker: str):  # type: ignore[override]
+        self.expiry_threads.append(threading.current_thread().name)
+        if ticker == "BAD":
+            raise RuntimeError("no option data")
+        return super().list_expiries(ticker)
 
-from options_trader.data import MarketData, MarketDataClient, OptionChainSlice, OptionQuote
-from options_trader.strategy import StrategyEngine, StrategyParameters
+    def fetch_chain(self, ticker: str, expiry: datetime):  # type: ignore[override]
+        self.chain_threads.append(threading.current_thread().name)
+        return super().fetch_chain(ticker, expiry)
 
 
-class DummyMarketDataClient(MarketDataClient):
+class CollectingNotifier:
     def __init__(self) -> None:
-        super().__init__()
-        self.valuation_time = datetime(2024, 1, 2, tzinfo=timezone.utc)
-        prices = [141 + i for i in range(10)]
-        self._data = MarketData(
-            ticker="ABC",
-            spot_price=float(prices[-1]),
-            valuation_date=self.valuation_time,
-            historical_prices=prices,
-        )
+        self.messages: list[str] = []
 
-    def fetch(self, ticker: str) -> MarketData:  # type: ignore[override]
-        return MarketData(
-            ticker=ticker,
-            spot_price=self._data.spot_price,
-            valuation_date=self.valuation_time,
-            historical_prices=list(self._data.historical_prices),
-        )
+    def notify(self, message: str) -> None:
+        self.messages.append(message)
 
 
-class DummyOptionChainClient:
-    def __init__(self, valuation_time: datetime) -> None:
-        self.valuation_time = valuation_time
-        self.expiry_1 = valuation_time + timedelta(days=120)
-        self.expiry_2 = valuation_time + timedelta(days=150)
+@pytest.fixture(scope="module")
+def market_client() -> DummyMarketDataClient:
+    # fetch() only hands out frozen MarketData, so one client can serve every
+    # test in the module.
+    return DummyMarketDataClient()
 
-    def list_expiries(self, ticker: str):  # type: ignore[override]
-        return [self.expiry_1, self.expiry_2]
 
-    def fetch_chain(self, ticker: str, expiry: datetime):  # type: ignore[override]
-        if expiry == self.expiry_1:
-            calls = [
-                OptionQuote(
-                    ticker=ticker,
-                    expiry=expiry,
-                    strike=150.0,
-                    option_type="call",
-                    bid=5.5,
-                    ask=6.5,
-                    last_price=6.0,
-                    implied_volatility=0.24,
-                )
-            ]
-            puts = [
-                OptionQuote(
-                    ticker=ticker,
-                    expiry=expiry,
-                    strike=135.0,
-                    option_type="put",
-                    bid=9.5,
-                    ask=10.5,
-                    last_price=10.0,
-                    implied_volatility=0.28,
-                ),
-                OptionQuote(
-                    ticker=ticker,
-                    expiry=expiry,
-                    strike=130.0,
-                    option_type="put",
-                    bid=7.0,
-                    ask=7.6,
-                    last_price=7.3,
-                    implied_volatility=0.27,
-                ),
-            ]
-        else:
-            calls = [
-                OptionQuote(
-                    ticker=ticker,
-                    expiry=expiry,
-                    strike=150.0,
-                    option_type="call",
-                    bid=4.8,
-                    ask=5.2,
-                    last_price=5.0,
-                    implied_volatility=0.22,
-                )
-            ]
-            puts = [
-                OptionQuote(
-                    ticker=ticker,
-                    expiry=expiry,
-                    strike=135.0,
-                    option_type="put",
-                    bid=8.0,
-                    ask=8.6,
-                    last_price=8.3,
-                    implied_volatility=0.25,
-                ),
-            ]
-
-        return OptionChainSlice(ticker=ticker, expiry=expiry, calls=calls, puts=puts)
-
-
-def test_engine_uses_live_option_quotes():
-    market_client = DummyMarketDataClient()
-    option_client = DummyOptionChainClient(market_client.valuation_time)
+@pytest.fixture(scope="module")
+def option_client(market_client: DummyMarketDataClient) -> DummyOptionChainClient:
+    return DummyOptionChainClient(market_client.valuation_time)
+
+
+def _check_live_quotes(engine, results):
+    result = results[0]
+
+    actual = {
+        "call_strike": result.call_strike,
+        "put_strike": result.put_strike,
+        "call_price_per_share": result.call_price_per_share,
+        "put_price_per_share": result.put_price_per_share,
+        "call_premium": result.call_premium,
+        "put_premium": result.put_premium,
+        "net_premium": result.net_premium,
+        "capital_at_risk": result.capital_at_risk,
+        "call_strike_pct": result.call_strike_pct,
+        "put_strike_pct": result.put_strike_pct,
+        "implied_volatility": result.implied_volatility,
+    }
+    assert actual == pytest.approx(
+        {
+            "call_strike": 150.0,
+            "put_strike": 135.0,
+            "call_price_per_share": 6.0,
+            "put_price_per_share": 10.0,
+            "call_premium": _EXPECTED_CALL_PREMIUM,
+            "put_premium": _EXPECTED_PUT_PREMIUM,
+            "net_premium": _EXPECTED_PUT_PREMIUM - _EXPECTED_CALL_PREMIUM,
+            "capital_at_risk": _EXPECTED_CAPITAL_AT_RISK,
+            "call_strike_pct": 1.0,
+            "put_strike_pct": 0.9,
+            "implied_volatility": (0.24 + 0.28) / 2,
+        }
+    )
+
+
+def _check_best_yield(engine, results):
+    best = engine.best_result("ABC")
+    assert best is not None
+    assert best.annualized_yield == max(r.annualized_yield for r in results)
+    assert engine.evaluate("ABC", top_k=1) == [best]
+
+
+@pytest.mark.parametrize(
+    "params, expected_len, check",
+    [
+        pytest.param(
+            StrategyParameters(
+                min_days=100,
+                max_days=140,
+                expiry_step=20,
+                call_strike_pct=1.0,
+                put_strike_pct=0.9,
+                put_strike_variation=(0.0,),
+                min_volatility=0.1,
+                max_volatility=0.4,
+            ),
+            1,
+            _check_live_quotes,
+            id="uses_live_option_quotes",
+        ),
+        pytest.param(
+            StrategyParameters(
+                min_days=100,
+                max_days=200,
+                expiry_step=10,
+                put_strike_variation=(0.0,),
+                min_volatility=0.1,
+                max_volatility=0.4,
+            ),
+            2,
+            _check_best_yield,
+            id="best_result_prefers_highest_yield",
+        ),
+    ],
+)
+def test_engine_evaluate(market_client, option_client, params, expected_len, check):
+    engine = StrategyEngine(
+        data_client=market_client, option_client=option_client, parameters=params
+    )
+
+    results = engine.evaluate("ABC")
+    assert len(results) == expected_len
+    check(engine, results)
+
+
+def test_engine_reuses_fetched_chains_until_cleared(market_client):
+    option_client = CountingOptionChainClient(market_client.valuation_time)
+    params = StrategyParameters(
+        min_days=100,
+        max_days=200,
+        expiry_step=10,
+        put_strike_variation=(0.0,),
+        min_volatility=0.1,
+        max_volatility=0.4,
+    )
+    engine = StrategyEngine(
+        data_client=market_client, option_client=option_client, parameters=params
+    )
+
+    engine.evaluate("ABC")
+    engine.best_result("ABC")
+    assert option_client.fetch_count == 2
+
+    engine.clear_cache()
+    engine.evaluate("ABC")
+    assert option_client.fetch_count == 4
+
+
+def test_put_variations_produce_distinct_strikes(market_client, option_client):
     params = StrategyParameters(
         min_days=100,
         max_days=140,
         expiry_step=20,
-        call_strike_pct=1.0,
-        put_strike_pct=0.9,
-        put_strike_variation=(0.0,),
+        put_strike_variation=(-0.05, 0.0),
         min_volatility=0.1,
         max_volatility=0.4,
     )
@@ -243,29 +337,31 @@ def test_engine_uses_live_option_quotes():
     )
 
     results = engine.evaluate("ABC")
-    assert len(results) == 1
-    result = results[0]
+    assert {result.put_strike for result in results} == {130.0, 135.0}
+
+
+def test_volatility_filters_remove_trades(market_client, option_client):
+    params = StrategyParameters(
+        min_days=100,
+        max_days=200,
+        expiry_step=10,
+        put_strike_variation=(0.0,),
+        min_volatility=0.3,
+    )
+    engine = StrategyEngine(
+        data_client=market_client, option_client=option_client, parameters=params
+    )
+
+    assert engine.evaluate("ABC") == []
 
-    assert result.call_strike == pytest.approx(150.0)
-    assert result.put_strike == pytest.approx(135.0)
-    assert result.call_price_per_share == pytest.approx(6.0)
-    assert result.put_price_per_share == pytest.approx(10.0)
-    assert result.call_premium == pytest.approx(6.0 * params.contract_size * params.call_contracts)
-    assert result.put_premium == pytest.approx(10.0 * params.contract_size * params.put_contracts)
-    assert result.net_premium == pytest.approx(result.put_premium - result.call_premium)
-    assert result.capital_at_risk == pytest.approx(135.0 * params.contract_size * params.put_contracts)
-    assert result.call_strike_pct == pytest.approx(1.0)
-    assert result.put_strike_pct == pytest.approx(0.9)
-    assert result.implied_volatility == pytest.approx((0.24 + 0.28) / 2)
-
-
-def test_best_result_prefers_highest_yield():
-    market_client = DummyMarketDataClient()
-    option_client = DummyOptionChainClient(market_client.valuation_time)
+
+def test_strike_tolerance_skips_distant_calls(market_client, option_client):
+    # The dummy chains only list a 150 call, 20% below the 180 target.
     params = StrategyParameters(
         min_days=100,
         max_days=200,
         expiry_step=10,
+        call_strike_pct=1.2,
         put_strike_variation=(0.0,),
         min_volatility=0.1,
         max_volatility=0.4,
@@ -274,10 +370,53 @@ def test_best_result_prefers_highest_yield():
         data_client=market_client, option_client=option_client, parameters=params
     )
 
-    results = engine.evaluate("ABC")
-    assert len(results) == 2
+    assert engine.evaluate("ABC") == []
+    assert len(engine.evaluate("ABC", replace(params, strike_tolerance_pct=0.25))) == 2
+    assert len(engine.evaluate("ABC", replace(params, strike_tolerance_pct=None))) == 2
 
-    best = engine.best_result("ABC")
-    assert best is not None
-    assert best.annualized_yield == max(r.annualized_yield for r in results)
 
+def test_run_reports_failures_and_fetches_chains_on_ticker_threads(market_client):
+    option_client = RecordingOptionChainClient(market_client.valuation_time)
+    notifier = CollectingNotifier()
+    engine = StrategyEngine(
+        data_client=market_client, option_client=option_client, notifier=notifier
+    )
+    config = StrategyConfig(
+        tickers=["abc", "bad"],
+        put_strike_variation=(0.0,),
+        min_volatility=0.1,
+        max_volatility=0.4,
+    )
+
+    results = engine.run(config)
+
+    assert [result.ticker for result in results] == ["ABC"]
+    assert notifier.messages[0].startswith("ABC: best expiry")
+    assert notifier.messages[1] == "Failed to evaluate BAD: no option data"
+    # run() already spreads tickers over a pool; the chains for a ticker must
+    # be fetched on that ticker's worker rather than a nested pool.
+    assert len(option_client.chain_threads) == 2
+    assert set(option_client.chain_threads) <= set(option_client.expiry_threads)
+
+
+def test_put_variations_on_the_same_strike_are_priced_once(market_client):
+    option_client = MultiStrikeOptionChainClient(market_client.valuation_time)
+    # Spot is 150: the put targets 128.25 and 129.60 both snap to the 130
+    # put, 135.00 lands on 135. The 150 call target sits halfway between the
+    # 145 and 155 calls, and ties go to the lower strike.
+    params = StrategyParameters(
+        min_days=100,
+        max_days=140,
+        put_strike_variation=(-0.05, -0.04, 0.0),
+        min_volatility=0.1,
+        max_volatility=0.4,
+    )
+    engine = StrategyEngine(
+        data_client=market_client, option_client=option_client, parameters=params
+    )
+
+    results = engine.evaluate("ABC")
+
+    assert len(results) == 2
+    assert sorted(result.put_strike for result in results) == [130.0, 135.0]
+    assert {result.call_strike for result in results} == {145.0}
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import math
+import statistics
+
+import pytest
+
+from options_trader import volatility
+from options_trader.volatility import _daily_std_numpy, _daily_std_python, historical_volatility
+
+PRICES = [100.0, 101.5, 99.8, 102.3, 103.1, 101.9, 104.4, 105.0, 103.7, 106.2]
+
+STD_FUNCTIONS = [
+    pytest.param(_daily_std_python, id="python"),
+    pytest.param(
+        _daily_std_numpy,
+        id="numpy",
+        marks=pytest.mark.skipif(volatility.np is None, reason="numpy not installed"),
+    ),
+]
+
+
+def _reference_std(prices: list[float]) -> float:
+    log_returns = [math.log(current / previous) for previous, current in zip(prices, prices[1:])]
+    return statistics.stdev(log_returns)
+
+
+@pytest.mark.parametrize("daily_std", STD_FUNCTIONS)
+def test_daily_std_matches_statistics_stdev(daily_std):
+    assert daily_std(PRICES) == pytest.approx(_reference_std(PRICES), rel=1e-12)
+
+
+@pytest.mark.parametrize("daily_std", STD_FUNCTIONS)
+@pytest.mark.parametrize("prices", [[0.0, 101.0, 102.0], [100.0, -1.0, 102.0], [100.0, 101.0, 0.0]])
+def test_daily_std_rejects_non_positive_prices(daily_std, prices):
+    with pytest.raises(ValueError, match="positive"):
+        daily_std(prices)
+
+
+@pytest.mark.parametrize("daily_std", STD_FUNCTIONS)
+def test_daily_std_of_two_prices_is_zero(daily_std):
+    assert daily_std([100.0, 105.0]) == 0.0
+
+
+def test_historical_volatility_annualizes_daily_std():
+    estimate = historical_volatility(PRICES, trading_days=252)
+
+    assert estimate.daily_std == pytest.approx(_reference_std(PRICES), rel=1e-12)
+    assert estimate.annualized == pytest.approx(estimate.daily_std * math.sqrt(252))